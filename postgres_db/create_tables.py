@@ -1,15 +1,17 @@
-from db_local_api import read, write
+from db_local_api import write_pipeline
 
 """
 Instructions for using this module:
 
 1. Use the `read` function to execute SELECT queries.
-   - The result will be printed in a table format by default.
-   - To suppress the table output, pass `verbose=False` as an argument.
+   - The result is returned as a DataFrame without printing it.
+   - To print it in a table format, pass `verbose=True` (and optionally `rows=N`, default 50).
 
 2. Use the `write` function for executing INSERT, UPDATE, DELETE, or other non-SELECT SQL statements.
 
-3. Note: The current user 'ds_user' does not have permissions to modify the table structure (e.g., ALTER TABLE). 
+3. Use the `write_pipeline` function to run a list of statements in a single round-trip.
+
+4. Note: The current user 'ds_user' does not have permissions to modify the table structure (e.g., ALTER TABLE). 
    Ensure you have the necessary permissions or consult the database administrator before attempting structural changes.
 
 Example usage:
@@ -21,8 +23,9 @@ data_frame = read("SELECT * FROM users WHERE ...;")
 
 """
 
-query = """
-drop table if exists readings;
+queries = [
+    "drop table if exists readings;",
+    """
 create table readings (
     timestamp timestamptz not null,
     city varchar(255) not null,
@@ -52,6 +55,7 @@ create table readings (
     snow_1h double precision not null,
     primary key (timestamp, lat, lon)
 );
-"""
+""",
+]
 
-write(query)
+write_pipeline(queries)
@@ -7,11 +7,13 @@ that allow seamless reading from and writing to a PostgreSQL database. The prima
 functions, `read` and `write`, provide more user-friendly interfaces for database interactions.
 """
 
+import functools
 import os
 import logging
 
 from dotenv import load_dotenv
 import pandas as pd
+import psycopg
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import SQLAlchemyError
@@ -30,15 +32,23 @@ DB_HOST = os.getenv("DB_HOST")
 DB_NAME = os.getenv("DB_NAME")
 
 POSTGRES_DB_SERVER = (
-    f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+    f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 )
 engine = create_engine(
-    POSTGRES_DB_SERVER, connect_args={"options": "-csearch_path=public"}
+    POSTGRES_DB_SERVER,
+    insertmanyvalues_page_size=1000,
+    pool_size=5,
+    max_overflow=10,
+    pool_recycle=1800,
+    pool_pre_ping=False,
+    connect_args={"options": "-csearch_path=public", "prepare_threshold": 3},
 )
 
 logger = logging.getLogger(__name__)
 
-load_dotenv(PROJECT_DIR_PATH / ".env")
+# Parsing bind parameters out of a query string is repeated work for query
+# templates that run many times, so the resulting TextClause is reused.
+_text = functools.lru_cache(maxsize=256)(text)
 
 
 class _db_api:
@@ -48,50 +58,40 @@ class _db_api:
 
     def __init__(self):
         """
-        Initialize the _db_api class and connect to the database.
-        """
-        self.engine = self.connect_to_db()
-        self.set_search_path()
-
-    def connect_to_db(self):
-        """
-        Connect to the PostgreSQL database using information from environment variables.
-
-        Returns:
-            Engine object: SQLAlchemy engine.
-        """
-        db_url = POSTGRES_DB_SERVER
-        return create_engine(db_url)
+        Initialize the _db_api class with the module's pooled engine.
 
-    def set_search_path(self):
-        """
-        Set the search path for the current connection to use the 'public' schema.
+        The engine's connect options already set the search path to the
+        'public' schema on every new connection.
         """
-        with self.engine.begin() as conn:
-            conn.execute(text("SET search_path TO public;"))
+        self.engine = engine
 
-    def _read(self, query, params=None):
+    def _read(self, query, params=None, chunksize=10_000):
         """
         Execute a SQL read query and return the result.
 
+        Rows are streamed from a server-side cursor in chunks, so the full
+        result set is never held as Python tuples before the DataFrame is built.
+
         Parameters:
             query (str): The SQL query to execute.
             params (dict, optional): Parameters for the SQL query.
+            chunksize (int, optional): The number of rows fetched per chunk.
 
         Returns:
-            Tuple: Result data and columns names.
+            DataFrame: The result of the query, or None if the query failed.
         """
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    text(query).bindparams(**params if params else {})
+            with self.engine.connect().execution_options(
+                stream_results=True
+            ) as conn:
+                chunks = pd.read_sql_query(
+                    _text(query), conn, params=params, chunksize=chunksize
                 )
-                data = result.fetchall()
-                columns = result.keys()
+                df = pd.concat(chunks, ignore_index=True, copy=False)
         except SQLAlchemyError as e:
-            logger.error(f"Query caused this error: {e}")
-            data, columns = None, None
-        return data, columns
+            logger.error("Query caused this error: %s", e)
+            df = None
+        return df
 
     def _write(self, query, params=None):
         """
@@ -103,10 +103,33 @@ class _db_api:
         """
         try:
             with self.engine.begin() as conn:
-                conn.execute(text(query).bindparams(**params if params else {}))
+                conn.execute(_text(query), params)
             logger.info("Data written to database.")
         except SQLAlchemyError as e:
-            logger.error(f"Failed to write to database due to this error: {e}")
+            logger.error("Failed to write to database due to this error: %s", e)
+
+    def _write_pipeline(self, queries):
+        """
+        Execute several SQL write queries in a single libpq pipeline.
+
+        The statements are queued on the connection and their results are
+        collected together, so they cost one round-trip instead of one each.
+        They all run in the same transaction.
+
+        Parameters:
+            queries (list[str]): The SQL queries to execute, in order.
+        """
+        try:
+            with self.engine.begin() as conn:
+                driver_conn = conn.connection.driver_connection
+                with driver_conn.cursor() as cur, driver_conn.pipeline():
+                    for query in queries:
+                        cur.execute(query)
+            logger.info("%d statements written to database.", len(queries))
+        # The statements run on the raw psycopg connection, so its errors are not
+        # wrapped in SQLAlchemyError.
+        except (SQLAlchemyError, psycopg.Error) as e:
+            logger.error("Failed to write to database due to this error: %s", e)
 
 
 _api = _db_api()
@@ -120,18 +143,24 @@ def read(query, **kwargs):
         query (str): The SQL query to execute.
         **kwargs:
             params (dict, optional): Parameters for the SQL query.
-            verbose (bool, optional): If True, print the result. Default is True.
+            verbose (bool, optional): If True, print the result. Default is False.
+            rows (int, optional): The number of rows to print when verbose. Default is 50.
 
     Returns:
         DataFrame: The result of the query.
     """
-    data, columns = _api._read(query, params=kwargs.get("params"))
-    if data is None or columns is None:
+    df = _api._read(query, params=kwargs.get("params"))
+    if df is None:
         logger.error("Query returned None.")
         return None
-    df = pd.DataFrame(data, columns=columns)
-    if kwargs.get("verbose", True):
-        print(tabulate(df, headers="keys", tablefmt="rounded_outline"))
+    if kwargs.get("verbose", False):
+        print(
+            tabulate(
+                df.head(kwargs.get("rows", 50)),
+                headers="keys",
+                tablefmt="rounded_outline",
+            )
+        )
     return df
 
 
@@ -145,3 +174,13 @@ def write(query, **kwargs):
             params (dict, optional): Parameters for the SQL query.
     """
     _api._write(query, params=kwargs.get("params"))
+
+
+def write_pipeline(queries):
+    """
+    Write to the database with several statements in one round-trip.
+
+    Parameters:
+        queries (list[str]): The SQL queries to execute, in order.
+    """
+    _api._write_pipeline(queries)
@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# The weather_reader modules import each other by bare name, as when run from
+# that directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "weather_reader"))
+
+# download_common reads the key at import; the tests never call the API.
+os.environ.setdefault("API_KEY", "test")
@@ -0,0 +1,27 @@
+import functools
+
+import download_async
+from download_common import DownloadStatus, ReadingBatcher
+from tests.test_validate_reading import make_row
+
+
+async def fake_download_one_async(client, base_url, city_lat_long_row):
+    (city,) = city_lat_long_row
+    if city == "Nowhere":
+        return None, DownloadStatus.NOT_FOUND
+    return make_row(city=city), DownloadStatus.OK
+
+
+def test_download_many_hands_on_full_batches_and_the_remainder(monkeypatch):
+    monkeypatch.setattr(download_async, "download_one_async", fake_download_one_async)
+    monkeypatch.setattr(
+        download_async, "ReadingBatcher", functools.partial(ReadingBatcher, 2)
+    )
+    cities = {city: {"lat": 1.0, "lon": 2.0} for city in ["A", "B", "Nowhere", "C"]}
+    batches = []
+
+    counter = download_async.download_many("http://test", cities, 2, batches.append)
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert sorted(c for batch in batches for c in batch["city"]) == ["A", "B", "C"]
+    assert counter == {DownloadStatus.OK: 3, DownloadStatus.NOT_FOUND: 1}
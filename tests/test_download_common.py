@@ -0,0 +1,22 @@
+from download_common import ReadingBatcher
+from tests.test_validate_reading import make_row
+
+
+def test_batch_is_released_at_the_boundary():
+    batcher = ReadingBatcher(batch_size=2)
+    assert batcher.add(make_row(city="A")) is None
+    batch = batcher.add(make_row(city="B"))
+    assert batch["city"].tolist() == ["A", "B"]
+    assert batcher.rows == []
+
+
+def test_remainder_is_released_on_flush():
+    batcher = ReadingBatcher(batch_size=2)
+    for city in "ABC":
+        batcher.add(make_row(city=city))
+    assert batcher.flush()["city"].tolist() == ["C"]
+    assert batcher.flush() is None
+
+
+def test_flush_of_an_empty_buffer_returns_none():
+    assert ReadingBatcher(batch_size=2).flush() is None
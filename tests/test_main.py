@@ -0,0 +1,131 @@
+import orjson
+import pytest
+
+import main
+
+NOW = 1_700_000_000.0
+FRESH = NOW - 60
+EXPIRED = NOW - main.GEOCODE_TTL_SECONDS - 60
+
+DALLAS_TX = {"country": "US", "state": "TX"}
+DALLAS_GA = {"country": "US", "state": "GA"}
+PARIS = {"country": "FR"}
+
+
+def cached(co_st, lat, lon, ts):
+    return {**co_st, "lat": lat, "lon": lon, "ts": ts}
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """
+    Point main at a temporary cities file and return a function that writes it.
+
+    The file's city_lat_lon is built from the cache entries of selected (the
+    cities themselves by default), as a previous run would have left it.
+    """
+    path = tmp_path / "cities.json"
+    monkeypatch.setattr(main, "CITIES_CONFIG_PATH", path)
+    monkeypatch.setattr(main.time, "time", lambda: NOW)
+    main._load_cities_config.cache_clear()
+
+    def write(cities, cache, selected=None):
+        selected = selected or cities
+        city_lat_lon = {}
+        for city, co_st in selected.items():
+            entry = cache[main.geocode_key(city, co_st)]
+            city_lat_lon[city] = {k: v for k, v in entry.items() if k != "ts"}
+        data = {
+            "cities": cities,
+            "city_lat_lon": city_lat_lon,
+            "cached_city_lat_lon": cache,
+        }
+        path.write_bytes(orjson.dumps(data))
+        return path
+
+    yield write
+    main._load_cities_config.cache_clear()
+
+
+@pytest.fixture
+def geocoded(monkeypatch):
+    """Record the cities passed to get_lat_lon and answer with fixed coordinates."""
+    calls = []
+    answers = {}
+
+    def fake_get_lat_lon(cities):
+        calls.append(set(cities))
+        return {city: answers[city] for city in cities if city in answers}
+
+    monkeypatch.setattr(main, "get_lat_lon", fake_get_lat_lon)
+    return calls, answers
+
+
+def test_fresh_entry_is_not_refetched(config, geocoded):
+    calls, _ = geocoded
+    path = config({"Paris": PARIS}, {"Paris|FR": cached(PARIS, 48.9, 2.3, FRESH)})
+    before = path.read_bytes()
+
+    result = main.update_city_lat_lon()
+
+    assert calls == []
+    assert result == {"Paris": {**PARIS, "lat": 48.9, "lon": 2.3}}
+    assert path.read_bytes() == before
+
+
+def test_expired_entry_is_refetched(config, geocoded):
+    calls, answers = geocoded
+    answers["Paris"] = {**PARIS, "lat": 48.8, "lon": 2.4}
+    path = config({"Paris": PARIS}, {"Paris|FR": cached(PARIS, 48.9, 2.3, EXPIRED)})
+
+    result = main.update_city_lat_lon()
+
+    assert calls == [{"Paris"}]
+    assert result == {"Paris": {**PARIS, "lat": 48.8, "lon": 2.4}}
+    written = orjson.loads(path.read_bytes())
+    assert written["city_lat_lon"] == result
+    assert written["cached_city_lat_lon"]["Paris|FR"]["ts"] == NOW
+
+
+def test_changed_state_refetches_only_that_city(config, geocoded):
+    calls, answers = geocoded
+    answers["Dallas"] = {**DALLAS_GA, "lat": 33.9, "lon": -84.8}
+    config(
+        {"Paris": PARIS, "Dallas": DALLAS_GA},
+        {
+            "Paris|FR": cached(PARIS, 48.9, 2.3, FRESH),
+            "Dallas|US|TX": cached(DALLAS_TX, 32.8, -96.8, FRESH),
+        },
+        selected={"Paris": PARIS, "Dallas": DALLAS_TX},
+    )
+
+    result = main.update_city_lat_lon()
+
+    assert calls == [{"Dallas"}]
+    assert result == {
+        "Paris": {**PARIS, "lat": 48.9, "lon": 2.3},
+        "Dallas": {**DALLAS_GA, "lat": 33.9, "lon": -84.8},
+    }
+
+
+def test_failed_refresh_keeps_old_coordinates_without_writing(
+    config, geocoded, monkeypatch
+):
+    calls, _ = geocoded
+    writes = []
+    monkeypatch.setattr(main, "write_cities_config", writes.append)
+    config({"Paris": PARIS}, {"Paris|FR": cached(PARIS, 48.9, 2.3, EXPIRED)})
+
+    result = main.update_city_lat_lon()
+
+    assert calls == [{"Paris"}]
+    assert result == {"Paris": {**PARIS, "lat": 48.9, "lon": 2.3}}
+    assert writes == []
+
+
+def test_mutating_the_result_does_not_change_the_cached_config(config, geocoded):
+    config({"Paris": PARIS}, {"Paris|FR": cached(PARIS, 48.9, 2.3, FRESH)})
+
+    main.update_city_lat_lon()["Paris"]["lat"] = 0.0
+
+    assert main.update_city_lat_lon()["Paris"]["lat"] == 48.9
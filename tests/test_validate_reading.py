@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from reading_schema import readings_to_frame
+from validate_reading import EXPECTED_DTYPES, _passes_fast_path, validate_reading
+
+INT_COLUMNS = ["timezone_offset", "dt", "sunrise", "sunset", "id"]
+STRING_COLUMNS = ["timezone", "main", "description", "icon", "city"]
+
+
+def make_row(**overrides) -> dict:
+    row = {
+        "lat": 40.7,
+        "lon": -74.0,
+        "timezone": "America/New_York",
+        "timezone_offset": -14400,
+        "dt": 1697371200,
+        "sunrise": 1697367600,
+        "sunset": 1697408400,
+        "temp": 288.1,
+        "feels_like": 287.5,
+        "pressure": 1012,
+        "humidity": 50,
+        "dew_point": 278.2,
+        "uvi": 1.2,
+        "clouds": 0,
+        "visibility": 10000,
+        "wind_speed": 3.1,
+        "wind_deg": 200,
+        "wind_gust": 0,
+        "id": 800,
+        "main": "Clear",
+        "description": "clear sky",
+        "icon": "01d",
+        "rain_1h": 0,
+        "snow_1h": 0,
+        "timestamp": datetime(2023, 10, 15, 12, tzinfo=timezone.utc),
+        "city": "New York",
+    }
+    row.update(overrides)
+    return row
+
+
+def make_frame(*rows) -> pd.DataFrame:
+    return pd.DataFrame([make_row(), *rows], dtype=object)
+
+
+def test_valid_rows_pass():
+    assert len(validate_reading(make_frame(make_row(city="Boston")))) == 2
+
+
+@pytest.mark.parametrize("lat", [90, -90, 90.5])
+def test_lat_on_or_past_bound_is_rejected(lat):
+    assert len(validate_reading(make_frame(make_row(lat=lat)))) == 1
+
+
+@pytest.mark.parametrize("humidity", [0, 100])
+def test_humidity_bounds_are_inclusive(humidity):
+    assert len(validate_reading(make_frame(make_row(humidity=humidity)))) == 2
+
+
+def test_humidity_past_bound_is_rejected():
+    assert len(validate_reading(make_frame(make_row(humidity=100.5)))) == 1
+
+
+@pytest.mark.parametrize("col", INT_COLUMNS)
+def test_non_integral_int_field_is_rejected(col):
+    assert len(validate_reading(make_frame(make_row(**{col: 1.5})))) == 1
+
+
+@pytest.mark.parametrize("col", INT_COLUMNS)
+def test_integral_float_in_int_field_passes(col):
+    assert len(validate_reading(make_frame(make_row(**{col: 2.0})))) == 2
+
+
+@pytest.mark.parametrize("value", ["", None])
+@pytest.mark.parametrize("col", STRING_COLUMNS)
+def test_empty_or_missing_string_is_rejected(col, value):
+    assert len(validate_reading(make_frame(make_row(**{col: value})))) == 1
+
+
+@pytest.mark.parametrize("col", ["lat", "temp", "dt", "timestamp"])
+def test_missing_required_value_is_rejected(col):
+    assert len(validate_reading(make_frame(make_row(**{col: None})))) == 1
+
+
+@pytest.mark.parametrize("col", ["rain_1h", "snow_1h"])
+def test_optional_precipitation_may_be_missing(col):
+    assert len(validate_reading(make_frame(make_row(**{col: None})))) == 2
+
+
+def test_valid_rows_are_returned_with_a_fresh_index():
+    df = make_frame(make_row(lat=95), make_row(city="Boston"))
+    valid = validate_reading(df)
+    assert valid["city"].tolist() == ["New York", "Boston"]
+    assert valid.index.tolist() == [0, 1]
+
+
+def test_readings_to_frame_matches_expected_dtypes():
+    df = readings_to_frame([make_row(), make_row(city="Boston")])
+    assert {col: str(dtype) for col, dtype in df.dtypes.items()} == EXPECTED_DTYPES
+
+
+def test_valid_batch_takes_the_fast_path():
+    df = readings_to_frame([make_row(), make_row(city="Boston", rain_1h=None)])
+    assert _passes_fast_path(df)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {},
+        {"lat": 90.0},
+        {"humidity": 100.0},
+        {"humidity": 100.5},
+        {"main": ""},
+        {"city": ""},
+        {"rain_1h": None},
+        {"temp": None},
+        {"description": None},
+    ],
+)
+def test_fast_and_full_paths_agree(overrides):
+    rows = [make_row(), make_row(**overrides)]
+    arrow = validate_reading(readings_to_frame(rows))
+    full = validate_reading(pd.DataFrame(rows, dtype=object))
+    assert len(arrow) == len(full)
+    assert arrow["lat"].tolist() == full["lat"].tolist()
+    assert arrow["humidity"].tolist() == full["humidity"].tolist()
+
+
+@pytest.mark.parametrize("col", INT_COLUMNS)
+def test_readings_to_frame_does_not_truncate_int_fields(col):
+    df = readings_to_frame([make_row(), make_row(**{col: 1.5})])
+    assert not _passes_fast_path(df)
+    assert df[col].tolist()[1] == 1.5
+    assert len(validate_reading(df)) == 1
+
+
+def test_rows_kept_from_a_fallback_batch_get_the_schema_dtypes():
+    df = readings_to_frame([make_row(), make_row(dt=1.5)])
+    valid = validate_reading(df)
+    assert len(valid) == 1
+    assert {col: str(dtype) for col, dtype in valid.dtypes.items()} == EXPECTED_DTYPES
+    assert valid["dt"].tolist() == [1697371200]
+
+
+def test_object_frame_is_returned_with_the_schema_dtypes():
+    valid = validate_reading(make_frame(make_row(lat=90)))
+    assert {col: str(dtype) for col, dtype in valid.dtypes.items()} == EXPECTED_DTYPES
+
+
+@pytest.mark.parametrize("humidity", [0, 100])
+def test_batch_with_humidity_on_a_bound_takes_the_fast_path(humidity):
+    df = readings_to_frame([make_row(), make_row(humidity=humidity)])
+    assert _passes_fast_path(df)
+
+
+@pytest.mark.parametrize("overrides", [{"lat": 90}, {"lon": -180}, {"humidity": 100.5}])
+def test_batch_on_or_past_an_open_bound_misses_the_fast_path(overrides):
+    assert not _passes_fast_path(readings_to_frame([make_row(**overrides)]))
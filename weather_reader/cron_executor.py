@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 
 import subprocess
+from pathlib import Path
 
-# Navigate to the project directory first
-project_dir = "/Users/bfaris96/Desktop/turing-proj/weather_reader/weather_reader"
-subprocess.call(["cd", project_dir])
+# Run from the project directory, wherever the repo is checked out
+project_dir = Path(__file__).resolve().parent
 
 # Activate the Poetry virtual environment
-subprocess.call(["poetry", "shell"])
+subprocess.call(["poetry", "shell"], cwd=project_dir)
@@ -1,25 +1,41 @@
+import atexit
+import io
 import logging
-from logging_config import configure_logger
 import os
 import time
-from datetime import datetime
+from datetime import date, datetime, timezone
 from enum import Enum
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 
+import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 
+from reading_schema import (
+    CURRENT_FIELDS,
+    READING_FIELDS,
+    WEATHER_FIELDS,
+    WEATHER_SCHEMA,
+    readings_to_frame,
+)
+
+try:
+    import adbc_driver_postgresql.dbapi as adbc
+except ImportError:
+    adbc = None
 
 PROJECT_DIR_PATH = Path(__file__).resolve().parents[1]
 DATA_DIR_PATH = PROJECT_DIR_PATH / "data_lake"
 DATA_DIR_PATH.mkdir(parents=True, exist_ok=True)
 
 load_dotenv(PROJECT_DIR_PATH / ".env")
-API_KEY = os.getenv("API_KEY")
+# Read once at import; a missing key fails here instead of after a run of 401s.
+API_KEY = os.environ["API_KEY"]
 
 Base = declarative_base()
 
@@ -27,19 +43,110 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_NAME = os.getenv("DB_NAME")
+# "copy" streams CSV through psycopg; "adbc" ingests Arrow via binary COPY.
+DB_INGEST = os.getenv("DB_INGEST", "copy")
 
 SERVERS = {
-    "LATLONG": "http://api.openweathermap.org/geo/1.0/direct?",
-    "WEATHER": "http://api.openweathermap.org/data/3.0/onecall?",
-    "POSTGRES_DB_SERVER": f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}",
+    "LATLONG": "https://api.openweathermap.org/geo/1.0/direct",
+    "WEATHER": "https://api.openweathermap.org/data/3.0/onecall?",
+    "POSTGRES_DB_SERVER": f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}",
+    "POSTGRES_ADBC_URI": f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}",
 }
 
+# Constant tail of every OneCall request; only lat and lon vary per city.
+WEATHER_URL_SUFFIX = f"&exclude=hourly,daily,minutely,alerts&appid={API_KEY}"
+
+# Ask the API for compressed JSON; httpx decompresses it transparently.
+HTTP_HEADERS = {"Accept-Encoding": "gzip, br"}
+
 engine = create_engine(
-    SERVERS["POSTGRES_DB_SERVER"], connect_args={"options": "-csearch_path=public"}
+    SERVERS["POSTGRES_DB_SERVER"],
+    insertmanyvalues_page_size=1000,
+    connect_args={"options": "-csearch_path=public", "prepare_threshold": 3},
 )
 
 DownloadStatus = Enum("DownloadStatus", "OK NOT_FOUND ERROR")
 
+# Let pandas share buffers between frames until one is written to.
+pd.set_option("mode.copy_on_write", True)
+
+
+def flatten_reading_json(city: str, reading: dict) -> dict:
+    """
+    Extract one flat row from a OneCall weather response and add city and timestamp fields.
+
+    The response shape is fixed, so the known fields are read directly instead of
+    walking the nested JSON generically. Optional fields that OpenWeather omits
+    (wind gusts, rain, snow) default to 0; other missing fields come through as None.
+
+    Args:
+        city (str): The name of the city for which the weather data is retrieved.
+        reading (dict): The nested JSON response containing weather data.
+
+    Returns:
+        dict: The flattened weather data.
+    """
+    current = reading["current"]
+    weather = current["weather"][0]
+
+    row = {k: reading.get(k) for k in READING_FIELDS}
+    row.update({k: current.get(k) for k in CURRENT_FIELDS})
+    row["wind_gust"] = current.get("wind_gust", 0)
+    row.update({k: weather.get(k) for k in WEATHER_FIELDS})
+    row["rain_1h"] = current.get("rain", {}).get("1h", 0)
+    row["snow_1h"] = current.get("snow", {}).get("1h", 0)
+    row["timestamp"] = datetime.now(timezone.utc)
+    row["city"] = city
+
+    return row
+
+
+# Readings are handed on in batches of this many rows, so validation and storage
+# start while downloads continue and memory is bounded by one batch.
+READING_BATCH_SIZE = 4096
+
+
+class ReadingBatcher:
+    """
+    Buffer flattened reading rows and release them as DataFrames of up to
+    batch_size rows.
+
+    Downloaders add each row as it arrives and pass on every frame returned by add,
+    then the remainder returned by flush once the downloads are done.
+    """
+
+    def __init__(self, batch_size: int = READING_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.rows = []
+
+    def add(self, row: dict) -> pd.DataFrame | None:
+        """
+        Buffer one row.
+
+        Args:
+            row (dict): A row produced by flatten_reading_json.
+
+        Returns:
+            pandas.DataFrame | None: A full batch, or None while the buffer fills.
+        """
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> pd.DataFrame | None:
+        """
+        Release the buffered rows.
+
+        Returns:
+            pandas.DataFrame | None: The buffered rows, or None if there are none.
+        """
+        if not self.rows:
+            return None
+        df = readings_to_frame(self.rows)
+        self.rows = []
+        return df
+
 
 def initial_report(actual_args, city_lat_lon) -> None:
     """
@@ -53,49 +160,200 @@ def initial_report(actual_args, city_lat_lon) -> None:
         None
     """
     logger = logging.getLogger(__name__)
-    logger.info(f"Getting weather for: {list(city_lat_lon.keys())}")
-    logger.info(f"Concurrency type: {actual_args[0]}")
-    logger.info(f"Max concurrency: {actual_args[1]}")
-    logger.info(f"Time started: {datetime.now()}")
+    logger.info("Getting weather for: %s", list(city_lat_lon.keys()))
+    logger.info("Concurrency type: %s", actual_args[0])
+    logger.info("Max concurrency: %s", actual_args[1])
+    logger.info("Time started: %s", datetime.now())
+
 
+# Row groups of up to one reading batch (4096 rows) keep footers small and scans
+# cache-sized; the page and write-batch sizes bound each encoded chunk. Only the
+# low-cardinality string columns are dictionary-encoded.
+PQ_ROW_GROUP_SIZE = READING_BATCH_SIZE
+PQ_DATA_PAGE_SIZE = 256 * 1024
+PQ_WRITE_BATCH_SIZE = 4096
+PQ_COMPRESSION = "zstd"
+PQ_COMPRESSION_LEVEL = 3
+PQ_DICTIONARY_COLUMNS = ["city", "main", "description", "icon", "timezone"]
 
-def save_to_pq(df) -> None:
+
+class ParquetSink:
     """
-    Save a DataFrame to a Parquet file locally.
+    Append DataFrames to one Parquet file per day instead of writing a file per call.
+
+    The writer is opened lazily on the first batch of the day, in a file named with
+    that batch's timestamp ('YYYY-MM-DD_HH:MM:SS'), and later batches on the same day
+    are appended to it as row groups. The file is finalized when the day rolls over
+    or when the sink is closed; existing files are never reopened or overwritten.
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR_PATH):
+        self.data_dir = data_dir
+        self.day = None
+        self.path = None
+        self.writer = None
+
+    def write(self, df) -> Path:
+        """
+        Append a DataFrame to today's Parquet file.
+
+        Args:
+            df (pandas.DataFrame): The DataFrame to append.
+
+        Returns:
+            Path: The Parquet file the rows were written to.
+        """
+        today = date.today()
+        if self.writer is not None and self.day != today:
+            self.close()
+
+        table = self.to_table(df)
+        if self.writer is None:
+            self.path = (
+                self.data_dir
+                / f"{datetime.now().strftime('%Y-%m-%d_%H:%M:%S')}.parquet"
+            )
+            self.writer = pq.ParquetWriter(
+                self.path,
+                WEATHER_SCHEMA,
+                compression=PQ_COMPRESSION,
+                compression_level=PQ_COMPRESSION_LEVEL,
+                use_dictionary=PQ_DICTIONARY_COLUMNS,
+                data_page_size=PQ_DATA_PAGE_SIZE,
+                write_batch_size=PQ_WRITE_BATCH_SIZE,
+            )
+            self.day = today
+
+        self.writer.write_table(table, row_group_size=PQ_ROW_GROUP_SIZE)
+        return self.path
+
+    @staticmethod
+    def to_table(df) -> pa.Table:
+        """
+        Convert a DataFrame to an Arrow table with WEATHER_SCHEMA (city dictionary-encoded).
+
+        Args:
+            df (pandas.DataFrame): The DataFrame to convert.
+
+        Returns:
+            pyarrow.Table: The converted table.
+        """
+        # A categorical city converts straight to the schema's dictionary type,
+        # whether the column arrives as Python objects or Arrow strings.
+        df = df.astype({"city": "category"})
+        return pa.Table.from_pandas(df, schema=WEATHER_SCHEMA, preserve_index=False)
 
-    This function converts the given DataFrame to a PyArrow Table and writes it to a Parquet file.
-    The Parquet file is named with the current timestamp in the format 'YYYY-MM-DD_HH:MM:SS'.
+    def close(self) -> None:
+        """
+        Finalize the open Parquet file, if any.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+pq_sink = ParquetSink()
+atexit.register(pq_sink.close)
+
+# A single worker keeps Parquet writes ordered and the sink single-threaded.
+# Registered after the sink, so at exit pending writes drain before it closes.
+_IO_POOL = ThreadPoolExecutor(max_workers=1)
+atexit.register(_IO_POOL.shutdown, wait=True)
+
+
+def _write_pq(df) -> None:
+    """
+    Append a DataFrame to the day's Parquet file and log the outcome.
 
     Args:
         df (pandas.DataFrame): The DataFrame to be saved as a Parquet file.
 
     Returns:
         None
+    """
+    try:
+        pq_path = pq_sink.write(df)
+        logging.info("Saved to %s", pq_path)
+    except Exception as e:
+        logging.error("Error saving to Parquet: %s", e)
+
+
+def save_to_pq(df) -> Future:
+    """
+    Save a DataFrame to a Parquet file locally, in the background.
+
+    The DataFrame is converted to a PyArrow Table and appended to the day's
+    Parquet file through the module's ParquetSink, so repeated saves in one process
+    share a file (and its footer and schema) instead of each producing a tiny file.
+    The write runs on a background thread so the caller can carry on (e.g. with the
+    database load) while the file is encoded and written.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to be saved as a Parquet file.
+
+    Returns:
+        concurrent.futures.Future: Completes once the rows have been written.
 
     Raises:
         Exception: If an error occurs during the Parquet writing process, an error message is logged.
 
     Example:
-        save_to_pq(my_dataframe)
+        save_to_pq(my_dataframe).result()
     """
-    try:
-        readings_dict = pa.Table.from_pandas(df)
-        pq_path = (
-            DATA_DIR_PATH / f"{datetime.now().strftime('%Y-%m-%d_%H:%M:%S')}.parquet"
-        )
-        pq.write_table(readings_dict, pq_path)
-        logging.info(f"Saved to {pq_path}")
-    except Exception as e:
-        logging.error(f"Error saving to Parquet: {e}")
+    return _IO_POOL.submit(_write_pq, df)
+
+
+def _copy_to_db(df) -> None:
+    """
+    Stream a DataFrame to the readings table with a single COPY FROM STDIN.
+
+    Args:
+        df (DataFrame): The DataFrame to be saved.
+
+    Returns:
+        None
+    """
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, sep="\t", na_rep="\\N")
+    copy_sql = (
+        f"COPY public.readings ({','.join(df.columns)}) FROM STDIN "
+        "WITH (FORMAT CSV, DELIMITER E'\\t', NULL '\\N')"
+    )
+    with engine.begin() as conn:
+        with conn.connection.cursor() as cur, cur.copy(copy_sql) as copy:
+            copy.write(buf.getvalue())
+
+
+def _ingest_to_db_adbc(df) -> None:
+    """
+    Ingest a DataFrame into the readings table as Arrow data through ADBC.
+
+    The ADBC driver sends the Arrow table with a binary COPY, skipping the
+    CSV text encoding step entirely.
+
+    Args:
+        df (DataFrame): The DataFrame to be saved.
+
+    Returns:
+        None
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with adbc.connect(SERVERS["POSTGRES_ADBC_URI"]) as conn:
+        with conn.cursor() as cur:
+            cur.adbc_ingest("readings", table, mode="append")
+        conn.commit()
 
 
 def save_to_db(df) -> None:
     """
     Save a DataFrame to a PostgreSQL database table.
 
+    The rows are bulk loaded into the readings table rather than inserted one
+    at a time. Set DB_INGEST=adbc to use the ADBC driver (if installed);
+    otherwise a CSV COPY FROM STDIN is used.
+
     Args:
         df (DataFrame): The DataFrame to be saved.
-        engine (sqlalchemy.engine.base.Engine): The SQLAlchemy engine connected to the database.
 
     Returns:
         None
@@ -104,10 +362,17 @@ def save_to_db(df) -> None:
         Exception: If there's an error while saving the DataFrame to the database.
     """
     try:
-        df.to_sql("readings", engine, if_exists="append", index=False)
-        logging.info(f"Saved to readings table at {SERVERS['POSTGRES_DB_SERVER']}")
+        if DB_INGEST == "adbc" and adbc is not None:
+            _ingest_to_db_adbc(df)
+        else:
+            if DB_INGEST == "adbc":
+                logging.warning(
+                    "adbc_driver_postgresql is not installed, falling back to COPY."
+                )
+            _copy_to_db(df)
+        logging.info("Saved to readings table at %s", SERVERS["POSTGRES_DB_SERVER"])
     except Exception as e:
-        logging.error(f"Error saving to database: {e}")
+        logging.error("Error saving to database: %s", e)
 
 
 def final_report(counter: Counter[DownloadStatus], start_time: datetime) -> None:
@@ -123,10 +388,10 @@ def final_report(counter: Counter[DownloadStatus], start_time: datetime) -> None
     """
     elapsed = time.perf_counter() - start_time
     plural = "s" if counter[DownloadStatus.OK] != 1 else ""
-    logging.info(f"{counter[DownloadStatus.OK]:3} reading{plural} downloaded.")
+    logging.info("%3d reading%s downloaded.", counter[DownloadStatus.OK], plural)
     if counter[DownloadStatus.NOT_FOUND]:
-        logging.error(f"{counter[DownloadStatus.NOT_FOUND]:3} not found.")
+        logging.error("%3d not found.", counter[DownloadStatus.NOT_FOUND])
     if counter[DownloadStatus.ERROR]:
         plural = "s" if counter[DownloadStatus.ERROR] != 1 else ""
-        logging.error(f"{counter[DownloadStatus.ERROR]:3} error{plural}.")
-    logging.info(f"Elapsed time: {elapsed:.2f}s")
+        logging.error("%3d error%s.", counter[DownloadStatus.ERROR], plural)
+    logging.info("Elapsed time: %.2fs", elapsed)
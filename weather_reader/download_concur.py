@@ -1,42 +1,46 @@
 import httpx
 import logging
-import logging.config
 from collections import Counter
-from pandas import DataFrame
-import pandas as pd
-from download_common import DownloadStatus
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from download_common import DownloadStatus, ReadingBatcher
 from download_seq import download_one
 
 
 def download_many(
-    base_url: str, city_lat_lon: dict, concur_type: str, max_concur_req: int
-) -> (DataFrame, Counter):
+    base_url: str, city_lat_lon: dict, concur_type: str, max_concur_req: int, on_batch
+) -> Counter:
     """
-    Download weather data for multiple cities concurrently using thread or process pools.
+    Download weather data for multiple cities concurrently using a thread pool.
+
+    Readings are handed to on_batch in batches as downloads complete, on the calling
+    thread, while the pool keeps downloading.
+
+    The work is network-bound, so a process pool would only add pickling and IPC for the
+    arguments and results; "process" is accepted for compatibility but runs on threads.
 
     Args:
         base_url (str): The base URL for the weather API.
         city_lat_lon (dict): A dictionary containing city information with latitude and longitude coordinates.
-        concur_type (str): The concurrency type, either "thread" or "process".
+        concur_type (str): The concurrency type, either "thread" or "process" (runs on threads).
         max_concur_req (int): The maximum number of concurrent requests to be made.
+        on_batch (callable): Called with each DataFrame of up to READING_BATCH_SIZE readings.
 
     Returns:
-        tuple: A tuple containing a DataFrame with weather data and a Counter object
-        tracking the download status.
+        Counter: The download status counts.
 
     Raises:
         Exception: If an error occurs during the download process, an error message is logged.
 
     Example:
-        df, counter = download_many(base_url, city_lat_lon, "thread", 5)
+        counter = download_many(base_url, city_lat_lon, "thread", 5, on_batch)
     """
     counter: Counter[DownloadStatus] = Counter()
-    dataframes = []
-    if concur_type == "thread":
-        from concurrent.futures import ThreadPoolExecutor as PoolExecutor, as_completed
-    elif concur_type == "process":
-        from concurrent.futures import ProcessPoolExecutor as PoolExecutor, as_completed
-    with PoolExecutor(max_workers=max_concur_req) as executor:
+    batcher = ReadingBatcher()
+    if concur_type == "process":
+        logging.warning(
+            "Downloads are I/O-bound; using a thread pool instead of a process pool."
+        )
+    with ThreadPoolExecutor(max_workers=max_concur_req) as executor:
         to_do_map = {}
         for city, data in city_lat_lon.items():
             city_entry = {city: data}
@@ -45,8 +49,11 @@ def download_many(
         done_iter = as_completed(to_do_map)
         for future in done_iter:
             try:
-                df, status = future.result()
-                dataframes.append(df)
+                row, status = future.result()
+                if row is not None:
+                    batch = batcher.add(row)
+                    if batch is not None:
+                        on_batch(batch)
             except httpx.HTTPStatusError as exc:
                 error_msg = "HTTP error {resp.status_code} - {resp.reason_phrase}"
                 error_msg = error_msg.format(resp=exc.response)
@@ -62,6 +69,8 @@ def download_many(
                 logging.error(error_msg)
             counter[status] += 1
 
-    df = pd.concat(dataframes, ignore_index=True)
+    batch = batcher.flush()
+    if batch is not None:
+        on_batch(batch)
 
-    return (df, counter)
+    return counter
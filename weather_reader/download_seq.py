@@ -1,14 +1,31 @@
+import atexit
 from collections import Counter
-from datetime import datetime
 import logging
-from logging_config import configure_logger
 
 import httpx
 from http import HTTPStatus
-import pandas as pd
-from pandas import DataFrame
-
-from download_common import DownloadStatus, API_KEY
+import orjson
+from download_common import (
+    DownloadStatus,
+    HTTP_HEADERS,
+    ReadingBatcher,
+    WEATHER_URL_SUFFIX,
+    flatten_reading_json,
+)
+
+# Shared by every get_weather call (and every thread in download_concur), so
+# TCP connections and TLS sessions to the API host are pooled, not redone.
+# The transport retries failed connection attempts before giving up.
+CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=20),
+    ),
+    headers=HTTP_HEADERS,
+    timeout=httpx.Timeout(10.0, connect=3.0),
+)
+atexit.register(CLIENT.close)
 
 
 def get_weather(base_url: str, lat: float, lon: float) -> (str, dict):
@@ -28,13 +45,14 @@ def get_weather(base_url: str, lat: float, lon: float) -> (str, dict):
     Raises:
         httpx.HTTPError: If an HTTP error occurs during the request.
     """
-    url = f"{base_url}lat={lat}&lon={lon}&exclude=hourly,daily,minutely,alerts&appid={API_KEY}"
-    resp = httpx.get(url)
+    url = f"{base_url}lat={lat}&lon={lon}{WEATHER_URL_SUFFIX}"
+    resp = CLIENT.get(url)
     resp.raise_for_status()
-    return resp.json()
+    logging.debug("Weather response over %s", resp.http_version)
+    return orjson.loads(resp.content)
 
 
-def download_one(base_url: str, city_lat_long_row: dict) -> (DataFrame, DownloadStatus):
+def download_one(base_url: str, city_lat_long_row: dict) -> (dict, DownloadStatus):
     """
     Download weather data for a city's latitude and longitude.
 
@@ -43,108 +61,62 @@ def download_one(base_url: str, city_lat_long_row: dict) -> (DataFrame, Download
         city_lat_long_row (dict): A dictionary containing city information.
 
     Returns:
-        tuple: A tuple containing a DataFrame and a DownloadStatus.
-            - The DataFrame contains weather data.
+        tuple: A tuple containing a dict and a DownloadStatus.
+            - The dict is the flattened weather reading (None if the download failed).
             - The DownloadStatus indicates the success or failure of the download.
 
     Raises:
         httpx.HTTPError: If an HTTP error occurs during the request.
     """
     status = DownloadStatus.ERROR
+    row = None
     try:
         for city, data in city_lat_long_row.items():
             lat = data.get("lat")
             lon = data.get("lon")
-            logging.info(f"Getting weather for: {city} {lat}, {lon}")
+            logging.info("Getting weather for: %s %s, %s", city, lat, lon)
             reading = get_weather(base_url, lat, lon)
 
-    except httpx.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         res = e.response
         if res.status_code == HTTPStatus.NOT_FOUND:
             status = DownloadStatus.NOT_FOUND
-            logging.error(f"{city} {lat}, {lon} not found: {res.url}")
+            logging.error("%s %s, %s not found: %s", city, lat, lon, res.url)
         else:
-            logging.error(f"HTTP Error for {city} {lat}, {lon}: {e}")
+            logging.error("HTTP Error for %s %s, %s: %s", city, lat, lon, e)
+    except httpx.RequestError as e:
+        logging.error("Request failed for %s %s, %s: %r", city, lat, lon, e)
 
     else:
-        df = flatten_reading_json(city, reading)
+        row = flatten_reading_json(city, reading)
         status = DownloadStatus.OK
-        logging.info(f"Successful retrieval for: {city} {lat}, {lon}")
-
-    return (df, status)
-
-
-def flatten_nested_dict(nested_dict, parent_key=None, sep="_") -> dict:
-    """
-    Flatten a nested dictionary into a flat dictionary.
-
-    Args:
-        nested_dict (dict): The nested dictionary to be flattened.
-        parent_key (None, optional): The parent key used for prefixing keys.
-        sep (str, optional): The separator used to separate keys in the flattened dictionary.
-
-    Returns:
-        dict: A flat dictionary containing flattened key-value pairs from the nested dictionary.
-    """
-    items = {}
-    for k, v in nested_dict.items():
-        new_key = f"{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.update(flatten_nested_dict(v, new_key, sep=sep))
-        else:
-            items[new_key] = v
-    return items
-
-
-def flatten_reading_json(city: str, reading: dict) -> DataFrame:
-    """
-    Flatten a JSON response from weather data into a DataFrame and add city
-    and timestamp columns.
-
-    Args:
-        city (str): The name of the city for which the weather data is retrieved.
-        reading (dict): The nested JSON response containing weather data.
-
-    Returns:
-        pandas.DataFrame: A DataFrame containing flattened weather data.
-    """
-    flattened_data = flatten_nested_dict(reading)
-
-    weather_info = reading["current"]["weather"][0]
-    flattened_data.update(flatten_nested_dict(weather_info, "weather"))
-
-    flattened_data["wind_gust"] = reading["current"].get("wind_gust", 0)
-    flattened_data["rain_1h"] = reading["current"].get("rain", {}).get("1h", 0)
-    flattened_data["snow_1h"] = reading["current"].get("snow", {}).get("1h", 0)
-
-    df = pd.DataFrame([flattened_data])
-    df["timestamp"] = datetime.now()
-    df["city"] = city
-
-    df.drop(columns=["weather", "1h"], errors="ignore", inplace=True)
+        logging.info("Successful retrieval for: %s %s, %s", city, lat, lon)
 
-    return df
+    return (row, status)
 
 
-def download_many(base_url: str, city_lat_lon: dict) -> (DataFrame, Counter):
+def download_many(base_url: str, city_lat_lon: dict, on_batch) -> Counter:
     """
-    Download weather data for multiple cities and aggregate the results.
+    Download weather data for multiple cities, handing on the readings in batches.
 
     Args:
         base_url (str): The base URL for weather data API.
         city_lat_lon (dict): A dictionary containing city information including latitude and longitude.
+        on_batch (callable): Called with each DataFrame of up to READING_BATCH_SIZE readings.
 
     Returns:
-        tuple: A tuple containing a DataFrame with weather data and a Counter with download status counts.
+        Counter: The download status counts.
     """
     counter: Counter[DownloadStatus] = Counter()
-    dataframes = []
+    batcher = ReadingBatcher()
     for city, data in city_lat_lon.items():
         try:
             one_response = download_one(base_url, {city: data})
-            df = one_response[0]
-            if df is not None:
-                dataframes.append(df)
+            row = one_response[0]
+            if row is not None:
+                batch = batcher.add(row)
+                if batch is not None:
+                    on_batch(batch)
             status = one_response[1]
         except httpx.HTTPStatusError as exc:
             error_msg = "HTTP error {resp.status_code} - {resp.reason_phrase}"
@@ -161,6 +133,8 @@ def download_many(base_url: str, city_lat_lon: dict) -> (DataFrame, Counter):
             logging.error(error_msg)
         counter[status] += 1
 
-    df = pd.concat(dataframes, ignore_index=True)
+    batch = batcher.flush()
+    if batch is not None:
+        on_batch(batch)
 
-    return (df, counter)
+    return counter
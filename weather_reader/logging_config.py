@@ -1,7 +1,18 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 
 
 def configure_logger():
+    # Getting the root logger
+    logger = logging.getLogger()
+
+    # Configuring only once, so repeated imports or calls don't attach
+    # duplicate handlers (and write every record twice)
+    if logger.handlers:
+        return
+
     # Creating a formatter for the logs
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -17,11 +28,17 @@ def configure_logger():
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
 
-    # Getting the root logger
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    # Handing records to a background thread that owns the file and console
+    # handlers, so logging threads only enqueue instead of contending on I/O
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
 
-    # Adding handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Setting the root logger level
+    logger.setLevel(logging.INFO)
 
+    # Adding the queue handler to the logger
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
@@ -1,9 +1,11 @@
+import asyncio
+import functools
 import logging
+import os
 from logging_config import configure_logger
 import time
 from datetime import datetime
-import json
-from urllib.parse import urlencode
+import orjson
 import httpx
 from pathlib import Path
 
@@ -14,6 +16,7 @@ from download_common import (
     final_report,
     SERVERS,
     API_KEY,
+    HTTP_HEADERS,
 )
 from download_async import download_many as download_readings_async
 from download_concur import download_many as download_readings_concur
@@ -24,58 +27,207 @@ configure_logger()
 
 PROJECT_DIR_PATH = Path(__file__).resolve().parents[1]
 CITIES_CONFIG_PATH = PROJECT_DIR_PATH / "weather_reader" / "cities.json"
+# Geocoded coordinates are refetched once their cache entry is older than this.
+GEOCODE_TTL_SECONDS = 30 * 24 * 60 * 60
+# Upper bound on geocoding requests in flight, to stay within the API's rate limit.
+GEOCODE_MAX_CONCUR = 10
+
+
+def geocode_key(city: str, co_st: dict) -> str:
+    """
+    Build the geocoding cache key for a city.
+
+    Args:
+        city (str): The name of the city.
+        co_st (dict): The city's country and state (if applicable).
+
+    Returns:
+        str: 'city|country', with '|state' appended when a state is given.
+    """
+    parts = [city, co_st["country"]]
+    if co_st.get("state"):
+        parts.append(co_st["state"])
+    return "|".join(parts)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_cities_config(mtime_ns: int) -> dict:
+    """
+    Parse the cities JSON file, memoized on its modification time.
+
+    Repeated main() calls in one process reuse the parsed config until the file
+    changes. The returned dict is shared between callers and must not be mutated.
+
+    Args:
+        mtime_ns (int): The file's st_mtime_ns; a new value invalidates the cache.
+
+    Returns:
+        dict: The parsed contents of the cities config.
+    """
+    return orjson.loads(CITIES_CONFIG_PATH.read_bytes())
 
 
 def update_city_lat_lon() -> dict:
     """
     Update or retrieve latitude and longitude coordinates for a list of cities from a JSON file.
 
-    This function checks if the latitude and longitude coordinates of the cities in the JSON file are up to date.
-    If not, it updates the coordinates and writes them back to the file.
+    Coordinates are cached per city under 'cached_city_lat_lon' in the JSON file,
+    keyed by geocode_key and stamped with the time they were fetched. Only cities
+    whose entry is missing or older than GEOCODE_TTL_SECONDS are geocoded; the
+    results are merged into the cache and written back to the file alongside the
+    refreshed 'city_lat_lon'. A city that fails to refresh keeps its old coordinates.
 
     Returns:
         dict: A dictionary containing city information with updated 'lat' and 'lon' coordinates.
     """
     try:
-        with open(CITIES_CONFIG_PATH, "r") as file:
-            data = json.load(file)
-            cities = data.get("cities", {})
-            city_lat_lon = data.get("city_lat_lon", {})
-            cached_city_lat_lon = data.get("cached_city_lat_lon", {})
-
-        cities_key_set = set(cities.keys())
-        if (cities_key_set != set(city_lat_lon.keys())) and cities_key_set.issubset(
-            set(cached_city_lat_lon.keys())
-        ):
-            logging.info(
-                "Attempting to update city latitude and longitude coordinates from cache."
-            )
-            logging.info(f"Starting update at: {datetime.now()}")
-            keys_to_update = cities_key_set - set(city_lat_lon.keys())
-            for key in keys_to_update:
-                city_lat_lon[key] = cached_city_lat_lon[key]
-            data["city_lat_lon"] = city_lat_lon
-            with open(CITIES_CONFIG_PATH, "w") as file:
-                json.dump(data, file, indent=4)
-            logging.info(f"Finished update at: {datetime.now()}")
-
-        elif cities_key_set != set(city_lat_lon.keys()):
+        data = _load_cities_config(os.stat(CITIES_CONFIG_PATH).st_mtime_ns)
+        cities = data.get("cities", {})
+        city_lat_lon = data.get("city_lat_lon", {})
+        # Copied, as the parsed config is shared through the load cache.
+        cached_city_lat_lon = dict(data.get("cached_city_lat_lon", {}))
+
+        now = time.time()
+        stale = {
+            city: co_st
+            for city, co_st in cities.items()
+            if now - cached_city_lat_lon.get(geocode_key(city, co_st), {}).get("ts", 0)
+            > GEOCODE_TTL_SECONDS
+        }
+
+        if stale or set(cities.keys()) != set(city_lat_lon.keys()):
             logging.info("Updating city latitude and longitude coordinates.")
-            logging.info(f"Starting update at: {datetime.now()}")
-            updated_city_lat_lon = get_lat_lon(cities)
-            data["city_lat_lon"] = updated_city_lat_lon
-            with open(CITIES_CONFIG_PATH, "w") as file:
-                json.dump(data, file, indent=4)
-            logging.info(f"Finished update at: {datetime.now()}")
+            logging.info("Starting update at: %s", datetime.now())
+            refreshed = {}
+            if stale:
+                logging.info("Geocoding uncached cities: %s", list(stale.keys()))
+                refreshed = get_lat_lon(stale)
+                for city, result in refreshed.items():
+                    cached_city_lat_lon[geocode_key(city, result)] = {
+                        **result,
+                        "ts": now,
+                    }
+            city_lat_lon = {}
+            for city, co_st in cities.items():
+                entry = cached_city_lat_lon.get(geocode_key(city, co_st))
+                if entry is not None:
+                    city_lat_lon[city] = {k: v for k, v in entry.items() if k != "ts"}
+            # Nothing to persist if every refresh failed and the selection is
+            # unchanged; skipping the write also keeps the load cache valid.
+            if refreshed or city_lat_lon != data.get("city_lat_lon", {}):
+                write_cities_config(
+                    {
+                        **data,
+                        "city_lat_lon": city_lat_lon,
+                        "cached_city_lat_lon": cached_city_lat_lon,
+                    }
+                )
+            logging.info("Finished update at: %s", datetime.now())
+
+        # Copied, so callers can't mutate the entries shared through the load cache.
+        return {city: dict(coords) for city, coords in city_lat_lon.items()}
 
+    except FileNotFoundError:
+        logging.error("Could not find the file at %s", CITIES_CONFIG_PATH)
+    except KeyError as e:
+        logging.error("Unexpected JSON format: Missing key %s", e)
 
 
-        return city_lat_lon
+def write_cities_config(data: dict) -> None:
+    """
+    Atomically replace the cities JSON file with new contents.
 
-    except FileNotFoundError:
-        logging.error(f"Could not find the file at {CITIES_CONFIG_PATH}")
-    except KeyError as e:
-        logging.error(f"Unexpected JSON format: Missing key {e}")
+    The data is written to a temporary file next to the config and then renamed over
+    it, so an interrupted write can never leave a truncated file (and lose the cache).
+
+    Args:
+        data (dict): The full contents of the cities config, including the caches.
+
+    Returns:
+        None
+    """
+    tmp_path = CITIES_CONFIG_PATH.with_suffix(".json.tmp")
+    tmp_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, CITIES_CONFIG_PATH)
+
+
+async def get_one_lat_lon_async(
+    client: httpx.AsyncClient, base_url: str, city: str, co_st: dict
+) -> (str, dict):
+    """
+    Asynchronously retrieves latitude and longitude coordinates for a single city.
+
+    Args:
+        client (httpx.AsyncClient): The asynchronous HTTP client.
+        base_url (str): The base URL for the geocoding API.
+        city (str): The name of the city.
+        co_st (dict): The city's country and state (if applicable).
+
+    Returns:
+        tuple: The city name and a copy of co_st with added 'lat' and 'lon' coordinates.
+    """
+    country_code = co_st["country"]
+
+    if country_code == "US":
+        q_value = f"{city},{co_st['state']},{country_code}"
+    else:
+        q_value = f"{city},{country_code}"
+
+    params = {"q": q_value, "limit": 1, "appid": API_KEY}
+    response = await client.get(base_url, params=params)
+    response.raise_for_status()
+    data = response.json()
+
+    return city, {**co_st, "lat": data[0]["lat"], "lon": data[0]["lon"]}
+
+
+async def get_lat_lon_async(
+    cities: dict, max_concur: int = GEOCODE_MAX_CONCUR
+) -> dict:
+    """
+    Asynchronously retrieves latitude and longitude coordinates for a list of cities.
+
+    Geocoding requests share one pooled HTTP/2 client, so the TLS handshake is paid
+    once per run rather than per city. They are issued concurrently, with at most
+    max_concur in flight at once. Cities that fail to geocode are logged and left out
+    of the result, so they are retried on the next run without discarding the cities
+    that succeeded.
+
+    Args:
+        cities (dict): A dictionary containing city information, including country and state (if applicable).
+        max_concur (int, optional): The maximum number of concurrent requests. Default is GEOCODE_MAX_CONCUR.
+
+    Returns:
+        dict: A dictionary containing city information with added 'lat' and 'lon' coordinates.
+    """
+    base_url = SERVERS["LATLONG"]
+    semaphore = asyncio.Semaphore(max_concur)
+    limits = httpx.Limits(max_connections=max_concur)
+
+    async def limited(client, city, co_st):
+        async with semaphore:
+            return await get_one_lat_lon_async(client, base_url, city, co_st)
+
+    timeout = httpx.Timeout(10.0, connect=3.0)
+
+    async with httpx.AsyncClient(
+        http2=True, limits=limits, timeout=timeout, headers=HTTP_HEADERS
+    ) as client:
+        results = await asyncio.gather(
+            *(limited(client, city, co_st) for city, co_st in cities.items()),
+            return_exceptions=True,
+        )
+
+    city_lat_lon = {}
+    for city, result in zip(cities, results):
+        if isinstance(result, (httpx.HTTPError, IndexError)):
+            logging.error("Could not geocode %s: %r", city, result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            city_lat_lon[city] = result[1]
+
+    return city_lat_lon
 
 
 def get_lat_lon(cities: dict) -> dict:
@@ -88,80 +240,98 @@ def get_lat_lon(cities: dict) -> dict:
     Returns:
         dict: A dictionary containing city information with added 'lat' and 'lon' coordinates.
     """
+    return asyncio.run(get_lat_lon_async(cities))
 
-    base_url = SERVERS["LATLONG"]
 
-    for city, co_st in cities.items():
-        country_code = co_st["country"]
+# Every downloader in DISPATCH takes (base_url, city_lat_lon, max_concur_req,
+# on_batch) and returns the status Counter; the adapters below fit each module's
+# download_many to that signature.
+
+
+def _download_thread(base_url, city_lat_lon, max_concur_req, on_batch):
+    return download_readings_concur(
+        base_url, city_lat_lon, "thread", max_concur_req, on_batch
+    )
+
+
+def _download_process(base_url, city_lat_lon, max_concur_req, on_batch):
+    return download_readings_concur(
+        base_url, city_lat_lon, "process", max_concur_req, on_batch
+    )
 
-        if country_code == "US":
-            q_value = f"{city},{co_st['state']},{country_code}"
-        else:
-            q_value = f"{city},{country_code}"
 
-        params = {"q": q_value, "limit": 1, "appid": API_KEY}
+def _download_coroutine(base_url, city_lat_lon, max_concur_req, on_batch):
+    # With no limit given, every request may be in flight at once.
+    return download_readings_async(
+        base_url, city_lat_lon, max_concur_req or len(city_lat_lon), on_batch
+    )
 
-        url = base_url + urlencode(params)
-        response = httpx.get(url)
-        response.raise_for_status()
-        data = response.json()
-        cities[city]["lat"] = data[0]["lat"]
-        cities[city]["lon"] = data[0]["lon"]
 
-    return cities
+def _download_seq(base_url, city_lat_lon, max_concur_req, on_batch):
+    # Sequential downloads have no concurrency to limit.
+    return download_readings_seq(base_url, city_lat_lon, on_batch)
 
 
-def main(concur_type=None, max_concur_req=None):
+# Concurrency type -> downloader.
+DISPATCH = {
+    "thread": _download_thread,
+    "process": _download_process,
+    "coroutine": _download_coroutine,
+    None: _download_seq,
+}
+
+
+def process_batch(df) -> None:
+    """
+    Validate one batch of downloaded readings and save the valid rows.
+
+    Args:
+        df (pandas.DataFrame): A batch of readings from a downloader.
+
+    Returns:
+        None
+    """
+    valid_readings_batch = validate_reading(df)
+    save_to_pq(valid_readings_batch)
+    save_to_db(valid_readings_batch)
+
+
+def main(concur_type="coroutine", max_concur_req=None):
     """
     Main function to orchestrate the data download and processing workflow.
 
-    This function retrieves latitude and longitude coordinates for a list of cities,
-    downloads weather data based on the specified concurrency type, and saves the
-    valid data to a Parquet file. It also generates and logs initial and final reports
-    including concurrency type, max concurrency, and elapsed time.
+    This function retrieves latitude and longitude coordinates for a list of cities and
+    downloads weather data based on the specified concurrency type. Readings are
+    validated and saved to Parquet and the database batch by batch as they arrive,
+    so the full download is never held in memory at once. It also generates and logs
+    initial and final reports including concurrency type, max concurrency, and
+    elapsed time.
 
     Args:
         concur_type (str, optional): The concurrency type to use for downloading data
-            (e.g., 'thread', 'process', 'coroutine'). Default is None.
+            (e.g., 'thread', 'process', 'coroutine'; see DISPATCH). None, or any
+            other value, downloads sequentially.
+            Default is 'coroutine', which issues all city requests concurrently over
+            one pooled HTTP client.
         max_concur_req (int, optional): The maximum number of concurrent requests to
-            make during data download. Default is None.
+            make during data download. Default is None, which for coroutines means
+            one connection per city.
 
     Returns:
-        None
+        collections.Counter: The download status counts.
     """
 
     city_lat_lon = update_city_lat_lon()
     initial_report((concur_type, max_concur_req), city_lat_lon)
     t0 = time.perf_counter()
 
-    if concur_type == "thread":
-        result = download_readings_concur(
-            SERVERS["WEATHER"], city_lat_lon, "thread", max_concur_req
-        )
-    elif concur_type == "process":
-        if __name__ == "__main__":
-            result = download_readings_concur(
-                SERVERS["WEATHER"], city_lat_lon, "process", max_concur_req
-            )
-    elif concur_type == "coroutine":
-        if __name__ == "__main__":
-            result = download_readings_async(
-                SERVERS["WEATHER"], city_lat_lon, max_concur_req=len(city_lat_lon)
-            )
-    else:
-        if __name__ == "__main__":
-            result = download_readings_seq(SERVERS["WEATHER"], city_lat_lon)
-
-    df = result[0]
-    counter = result[1]
-    valid_readings_batch = validate_reading(df)
-    save_to_pq(valid_readings_batch)
-    save_to_db(valid_readings_batch)
+    download = DISPATCH.get(concur_type, DISPATCH[None])
+    counter = download(SERVERS["WEATHER"], city_lat_lon, max_concur_req, process_batch)
 
     final_report(counter, t0)
 
-    return df
+    return counter
 
 
 if __name__ == "__main__":
-    print(main(concur_type='coroutine'))
+    print(main())
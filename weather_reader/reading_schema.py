@@ -0,0 +1,110 @@
+"""
+Column layout and Arrow schema of a batch of weather readings.
+
+Kept free of configuration (no .env or API key needed at import), so validation
+and tests can build and check batches without the download settings.
+"""
+
+import logging
+
+import pandas as pd
+import pyarrow as pa
+
+
+logger = logging.getLogger(__name__)
+
+# Fields picked out of a OneCall response, in the column order of the readings table.
+READING_FIELDS = ("lat", "lon", "timezone", "timezone_offset")
+CURRENT_FIELDS = (
+    "dt",
+    "sunrise",
+    "sunset",
+    "temp",
+    "feels_like",
+    "pressure",
+    "humidity",
+    "dew_point",
+    "uvi",
+    "clouds",
+    "visibility",
+    "wind_speed",
+    "wind_deg",
+)
+WEATHER_FIELDS = ("id", "main", "description", "icon")
+READING_COLUMNS = (
+    READING_FIELDS
+    + CURRENT_FIELDS
+    + ("wind_gust",)
+    + WEATHER_FIELDS
+    + ("rain_1h", "snow_1h", "timestamp", "city")
+)
+
+# Arrow types of READING_COLUMNS, matching the readings table. Passing this to
+# from_pandas skips per-call type inference and keeps every batch's schema identical.
+WEATHER_SCHEMA = pa.schema(
+    [
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("timezone", pa.string()),
+        ("timezone_offset", pa.int64()),
+        ("dt", pa.int64()),
+        ("sunrise", pa.int64()),
+        ("sunset", pa.int64()),
+        ("temp", pa.float64()),
+        ("feels_like", pa.float64()),
+        ("pressure", pa.float64()),
+        ("humidity", pa.float64()),
+        ("dew_point", pa.float64()),
+        ("uvi", pa.float64()),
+        ("clouds", pa.float64()),
+        ("visibility", pa.float64()),
+        ("wind_speed", pa.float64()),
+        ("wind_deg", pa.float64()),
+        ("wind_gust", pa.float64()),
+        ("id", pa.int64()),
+        ("main", pa.string()),
+        ("description", pa.string()),
+        ("icon", pa.string()),
+        ("rain_1h", pa.float64()),
+        ("snow_1h", pa.float64()),
+        ("timestamp", pa.timestamp("us", "UTC")),
+        ("city", pa.dictionary(pa.int16(), pa.string())),
+    ]
+)
+# WEATHER_SCHEMA with city as plain strings, for the in-memory batch: the pandas
+# string methods used in validation don't apply to dictionary columns.
+FRAME_SCHEMA = WEATHER_SCHEMA.set(
+    WEATHER_SCHEMA.get_field_index("city"), pa.field("city", pa.string())
+)
+
+
+def readings_to_frame(rows: list) -> pd.DataFrame:
+    """
+    Build the batch DataFrame from flattened reading rows in a single pass.
+
+    The rows are converted straight into Arrow arrays and safely cast to FRAME_SCHEMA,
+    and the frame wraps those arrays (pd.ArrowDtype) without copying, so validation
+    and the Parquet sink work on the same buffers instead of converting between
+    pandas and Arrow. Casting (rather than converting with the schema) refuses lossy
+    conversions such as 1.5 to an integer column. If a value doesn't fit its schema
+    type, the batch falls back to inferred NumPy dtypes and the bad value is left for
+    validate_reading to reject; the rows it keeps are cast back to FRAME_SCHEMA.
+
+    Args:
+        rows (list[dict]): Rows produced by flatten_reading_json.
+
+    Returns:
+        pandas.DataFrame: One row per reading, with the columns in READING_COLUMNS order.
+    """
+    if not rows:
+        return FRAME_SCHEMA.empty_table().to_pandas(types_mapper=pd.ArrowDtype)
+    try:
+        table = pa.Table.from_pylist(rows).select(FRAME_SCHEMA.names)
+        table = table.cast(FRAME_SCHEMA)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as e:
+        logger.warning("Readings don't match FRAME_SCHEMA, inferring dtypes: %s", e)
+        return pd.DataFrame(
+            {col: [row[col] for row in rows] for col in READING_COLUMNS}, copy=False
+        )
+
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
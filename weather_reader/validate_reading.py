@@ -1,15 +1,27 @@
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import datetime
 import logging
 import logging.config
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+from reading_schema import FRAME_SCHEMA
 
 
 logger = logging.getLogger(__name__)
 
 
 class Reading(BaseModel):
+    """
+    Schema of one weather reading. validate_reading applies the same constraints
+    column-wise; the model is kept for documenting and validating single records,
+    e.g. Reading.model_validate(record). Unknown keys are ignored.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
     lat: float = Field(..., gt=-90, lt=90)
     lon: float = Field(..., gt=-180, lt=180)
     timezone: str
@@ -38,39 +50,199 @@ class Reading(BaseModel):
     city: str
 
 
+def _numeric(s: pd.Series) -> np.ndarray:
+    """Coerce a column to float64, with NaN for missing or non-numeric values."""
+    return pd.to_numeric(s, errors="coerce").to_numpy(
+        dtype=np.float64, na_value=np.nan
+    )
+
+
+def _present(s: pd.Series) -> np.ndarray:
+    """A required numeric column: the value is a finite number."""
+    return np.isfinite(_numeric(s))
+
+
+def _integer(s: pd.Series) -> np.ndarray:
+    """A required integer column: the value is a finite number with no fraction."""
+    arr = _numeric(s)
+    return np.isfinite(arr) & (arr == np.trunc(arr))
+
+
+def _optional(s: pd.Series) -> np.ndarray:
+    """An optional numeric column: the value is missing or a finite number."""
+    arr = _numeric(s)
+    return s.isna().to_numpy() | np.isfinite(arr)
+
+
+def _non_empty_str(s: pd.Series) -> np.ndarray:
+    """A required string column: the value is a non-empty string."""
+    if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+        return np.zeros(len(s), dtype=bool)
+    return (s.str.len() > 0).to_numpy(dtype=bool, na_value=False)
+
+
+def _check_bounds(arr: np.ndarray, lo, hi) -> np.ndarray:
+    """Elementwise lo < arr < hi; lo and hi may be scalars or arrays that broadcast."""
+    return (arr > lo) & (arr < hi)
+
+
+def _between(lo: float, hi: float, inclusive: bool):
+    """A required numeric column bounded by (lo, hi), or [lo, hi] if inclusive."""
+
+    def check(s: pd.Series) -> np.ndarray:
+        arr = _numeric(s)
+        if inclusive:
+            return (arr >= lo) & (arr <= hi)
+        return _check_bounds(arr, lo, hi)
+
+    return check
+
+
+def _datetime(s: pd.Series) -> np.ndarray:
+    """A required timestamp column: the value parses as a datetime."""
+    return pd.to_datetime(s, errors="coerce").notna().to_numpy()
+
+
+# dtypes of a batch built by readings_to_frame, derived from its schema. A frame
+# that matches has every value typed already, so validate_reading can take a
+# cheaper fast path.
+EXPECTED_DTYPES = {f.name: str(pd.ArrowDtype(f.type)) for f in FRAME_SCHEMA}
+FLOAT_COLUMNS = [c for c, t in EXPECTED_DTYPES.items() if t == "double[pyarrow]"]
+STRING_COLUMNS = [c for c, t in EXPECTED_DTYPES.items() if t == "string[pyarrow]"]
+OPTIONAL_COLUMNS = ["rain_1h", "snow_1h"]
+
+# Open bounds of the range-checked columns, applied by the fast path to the
+# (rows x 3) matrix of these columns in one broadcast comparison. Humidity is
+# bounded by [0, 100], so its open bounds are the next floats outside that range.
+_BOUNDED = ["lat", "lon", "humidity"]
+_BOUNDED_IDX = [FLOAT_COLUMNS.index(col) for col in _BOUNDED]
+_LO = np.array([-90, -180, np.nextafter(0, -1)], dtype=np.float64)
+_HI = np.array([90, 180, np.nextafter(100, 101)], dtype=np.float64)
+
+# Cap on the failing values reported per column, so a bad batch is logged as
+# one bounded record.
+N_FAILURE_CASES = 50
+
+# Column -> vectorized predicate mirroring the Reading field constraints.
+CHECKS = {
+    "lat": _between(-90, 90, inclusive=False),
+    "lon": _between(-180, 180, inclusive=False),
+    "timezone": _non_empty_str,
+    "timezone_offset": _integer,
+    "dt": _integer,
+    "sunrise": _integer,
+    "sunset": _integer,
+    "temp": _present,
+    "feels_like": _present,
+    "pressure": _present,
+    "humidity": _between(0, 100, inclusive=True),
+    "dew_point": _present,
+    "uvi": _present,
+    "clouds": _present,
+    "visibility": _present,
+    "wind_speed": _present,
+    "wind_deg": _present,
+    "wind_gust": _present,
+    "id": _integer,
+    "main": _non_empty_str,
+    "description": _non_empty_str,
+    "icon": _non_empty_str,
+    "rain_1h": _optional,
+    "snow_1h": _optional,
+    "timestamp": _datetime,
+    "city": _non_empty_str,
+}
+
+
+def _passes_fast_path(df: pd.DataFrame) -> bool:
+    """
+    Check whether a batch typed as EXPECTED_DTYPES is entirely valid, in a few
+    whole-frame passes.
+
+    With the dtypes matching, only missing values, non-finite floats, empty strings
+    and the lat/lon/humidity bounds are left to check, with the same bounds as
+    CHECKS.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to check.
+
+    Returns:
+        bool: True if every row is valid.
+    """
+    if {col: str(dtype) for col, dtype in df.dtypes.items()} != EXPECTED_DTYPES:
+        return False
+    if df.drop(columns=OPTIONAL_COLUMNS).isna().to_numpy().any():
+        return False
+    # Extracted once and reused: the bounded columns are a slice of this matrix.
+    floats = df[FLOAT_COLUMNS].to_numpy(np.float64, na_value=0.0)
+    if not np.isfinite(floats).all():
+        return False
+    if not _check_bounds(floats[:, _BOUNDED_IDX], _LO, _HI).all():
+        return False
+
+    return all((df[col].str.len() > 0).all() for col in STRING_COLUMNS)
+
+
 def validate_reading(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Validate rows in a DataFrame using a Pydantic model.
+    Validate rows in a DataFrame against the constraints of the Reading model.
+
+    The frame is first converted to Arrow-backed dtypes (if it isn't already), so
+    string columns are Arrow arrays instead of boxed Python objects and the checks
+    run on Arrow buffers. Each column is checked in one vectorized pass (type,
+    presence and range), and the results are combined into a single row mask
+    instead of building a Pydantic model per row. Invalid rows are dropped and
+    logged in a single summary record: the failure count per column and up to
+    N_FAILURE_CASES failing values by index.
 
-    This function takes a DataFrame as input and validates each row using a Pydantic model called `Reading`.
-    Rows that fail validation are logged as errors, and valid rows are counted and logged as information.
+    A batch that already has the expected dtypes and passes a few whole-frame
+    checks is returned as is, without running the per-column checks.
 
     Args:
         df (pd.DataFrame): The DataFrame containing the rows to be validated.
 
     Returns:
-        pd.DataFrame: The same DataFrame passed as input.
+        pd.DataFrame: The rows of df that passed validation, typed as FRAME_SCHEMA
+        (Arrow-backed) and with a fresh 0..n-1 index.
 
     Example:
         validated_df = validate_reading(my_dataframe)
     """
-    invalid_rows = []
-    valid_rows_count = 0
-
-    for index, row in df.iterrows():
-        try:
-            reading = Reading(**row.to_dict())
-            valid_rows_count += 1
+    if _passes_fast_path(df):
+        logger.info("Total Valid Rows: %d", len(df))
+        logger.info("All rows are valid.")
+        return df.reset_index(drop=True)
 
-        except ValidationError as e:
-            invalid_rows.append((index, str(e)))
-            logger.error(f"Validation Error at row {index}: {str(e)}")
+    # Converting an already Arrow-backed frame is wasted work, and drops the
+    # time zone from Arrow timestamps.
+    if not all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes):
+        df = df.convert_dtypes(dtype_backend="pyarrow", convert_integer=False)
+    results = {col: check(df[col]) for col, check in CHECKS.items()}
+    mask = np.logical_and.reduce(list(results.values()))
+    invalid_count = int((~mask).sum())
 
-    logger.info(f"Total Valid Rows: {valid_rows_count}")
+    logger.info("Total Valid Rows: %d", len(df) - invalid_count)
 
-    if invalid_rows:
-        logger.warning(f"Total Invalid Rows: {len(invalid_rows)}")
+    if invalid_count:
+        failure_cases = {
+            col: {
+                "count": int((~ok).sum()),
+                "values": df[col][~ok].head(N_FAILURE_CASES).to_dict(),
+            }
+            for col, ok in results.items()
+            if not ok.all()
+        }
+        logger.warning(
+            "Total Invalid Rows: %d; failure cases (first %d per column): %s",
+            invalid_count,
+            N_FAILURE_CASES,
+            failure_cases,
+        )
     else:
         logger.info("All rows are valid.")
 
-    return df
+    # A batch that fell back to inferred dtypes (e.g. dt widened to float by a bad
+    # row) gets the schema types back, so integer columns are written as integers.
+    valid = pa.Table.from_pandas(df.loc[mask], preserve_index=False)
+    valid = valid.select(FRAME_SCHEMA.names).cast(FRAME_SCHEMA)
+    return valid.to_pandas(types_mapper=pd.ArrowDtype)